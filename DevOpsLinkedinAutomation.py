@@ -1,15 +1,33 @@
-import openai
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from string import Template
 import schedule
 import time
 import os
 import logging
-import requests
+import hashlib
+import tempfile
+import threading
+import httpx
+from cachetools import TTLCache
+import diskcache
 from dotenv import load_dotenv
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import EKS
-from diagrams.azure.compute import AKS
-from diagrams.onprem.client import User
-from diagrams.onprem.compute import Server
+from openai import APIConnectionError, OpenAI, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import tiktoken
+# GPTCache is optional; the diskcache store below stands in when it is missing
+try:
+    from gptcache import cache, Config as GPTCacheConfig
+    from gptcache.adapter.api import get as cache_get, put as cache_put
+    from gptcache.embedding import Onnx
+    from gptcache.manager import manager_factory
+    from gptcache.processor.pre import get_prompt
+    from gptcache.similarity_evaluation.exact_match import ExactMatchEvaluation
+    GPTCACHE_INSTALLED = True
+except ImportError:
+    GPTCACHE_INSTALLED = False
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,17 +39,96 @@ logging.basicConfig(
     handlers=[logging.FileHandler("linkedin_poster.log"), logging.StreamHandler()],
 )
 
-# LinkedIn API credentials
-CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
-CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
-ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")  # Refresh this token periodically
+# API credentials, validated once at startup so no LLM budget is spent on a post that would 401
+@dataclass(frozen=True)
+class Config:
+    """OpenAI and LinkedIn credentials the poster needs."""
 
-# OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
-    logging.error("OpenAI API key not found in environment variables.")
+    openai_key: str = field(repr=False, metadata={"env": "OPENAI_API_KEY"})
+    linkedin_token: str = field(repr=False, metadata={"env": "LINKEDIN_ACCESS_TOKEN"})  # Refresh this token periodically
+    person_urn: str = field(metadata={"env": "LINKEDIN_PERSON_URN"})  # e.g. urn:li:person:abc123
+    auth_header: bytes = field(init=False, repr=False)
+
+    def __post_init__(self):
+        missing = [f.metadata["env"] for f in fields(self) if f.init and not getattr(self, f.name)]
+        if missing:
+            raise ValueError(f"Missing credentials in environment variables: {', '.join(missing)}")
+        object.__setattr__(self, "auth_header", f"Bearer {self.linkedin_token}".encode())
+
+    @classmethod
+    def from_env(cls):
+        """Build the config from environment variables."""
+        return cls(**{f.name: os.getenv(f.metadata["env"]) for f in fields(cls) if f.init})
+
+try:
+    CFG = Config.from_env()
+except ValueError as e:
+    logging.error(e)
     exit(1)
 
+# Initialize the OpenAI client; retries are handled by request_completion()
+client = OpenAI(api_key=CFG.openai_key, max_retries=0)
+OPENAI_MODEL = "gpt-4o-mini"
+
+# OpenAI rate limits for the account tier
+OPENAI_RPM_LIMIT = 500
+OPENAI_TPM_LIMIT = 200000
+
+# Shared HTTP/2 client so LinkedIn calls multiplex over one kept-alive connection.
+# The transport only retries failed connection attempts, so a ugcPosts POST is never re-sent.
+LINKEDIN_CLIENT = httpx.Client(
+    headers={"Authorization": CFG.auth_header},
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+    ),
+    timeout=httpx.Timeout(10.0),
+)
+
+# LinkedIn endpoints and request bodies, serialized once instead of on every post
+REGISTER_UPLOAD_URL = "https://api.linkedin.com/v2/assets?action=registerUpload"
+UGC_POSTS_URL = "https://api.linkedin.com/v2/ugcPosts"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+REGISTER_UPLOAD_BODY = json.dumps(
+    {
+        "registerUploadRequest": {
+            "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
+            "owner": CFG.person_urn,
+            "serviceRelationships": [
+                {
+                    "relationshipType": "OWNER",
+                    "identifier": "urn:li:userGeneratedContent",
+                }
+            ],
+        }
+    }
+).encode()
+
+POST_BODY_TEMPLATE = Template(
+    json.dumps(
+        {
+            "author": CFG.person_urn,
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {"text": "$content"},
+                    "shareMediaCategory": "IMAGE",
+                    "media": [{"status": "READY", "media": "$image_urn"}],
+                }
+            },
+            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
+        }
+    )
+)
+
+def build_post_body(content, image_urn):
+    """Fill the ugcPosts template with JSON-escaped content and image URN."""
+    return POST_BODY_TEMPLATE.substitute(
+        content=json.dumps(content)[1:-1], image_urn=json.dumps(image_urn)[1:-1]
+    ).encode()
+
 # List of topics to cycle through weekly
 TOPICS = [
     "DevOps",
@@ -56,88 +153,403 @@ SEO_KEYWORDS = {
     "AKS": "Azure Kubernetes Service, managed Kubernetes, cloud-native apps, Azure DevOps, container orchestration",
 }
 
+# Invariant system prompt shared by every request. Kept above 1024 tokens so
+# OpenAI's automatic prompt caching can reuse it across calls.
+STATIC_INSTRUCTIONS = """
+You are a senior DevOps engineer and technical writer who publishes short LinkedIn posts
+about DevOps and cloud-native technologies for a professional audience of engineers,
+engineering managers, SREs, platform teams, and technical recruiters.
+
+Your task is to write one LinkedIn post per topic listed in the user message. Each topic
+comes with a list of SEO keywords for Google and LinkedIn search. Work the keywords into
+the post naturally; never list them mechanically and never stuff the same phrase twice.
+
+Output format:
+- Respond with a single JSON object and nothing else.
+- Each key is a topic name exactly as it appears in the user message, with the same
+  spelling and capitalisation.
+- Each value is the complete text of the LinkedIn post for that topic as a plain string.
+- Do not wrap the JSON in Markdown code fences and do not add commentary before or after it.
+- Include every topic from the user message exactly once. Do not invent extra topics.
+
+Length and structure:
+- Keep each post between 80 and 150 words. LinkedIn truncates long posts behind a
+  "see more" link, so the first two lines must carry the main idea on their own.
+- Open with a hook: a concrete problem, a surprising number, a common mistake, or a short
+  question that a practitioner would recognise from their own work.
+- Follow with two to four short paragraphs or a compact list of three to five points.
+  Separate paragraphs with a single blank line. Use plain hyphens for list items.
+- Close with a call to action that invites discussion, such as asking readers how they
+  handle the problem in their own teams or which tool they prefer and why.
+- Finish with three to five relevant hashtags on the last line, for example #DevOps,
+  #Kubernetes, #CloudNative, #InfrastructureAsCode, #PlatformEngineering, #SRE.
+
+Tone and voice:
+- Write in the first person as an experienced practitioner sharing lessons learned.
+- Be confident, practical, and friendly. Avoid hype, buzzword chains, and marketing
+  language such as "revolutionary", "game-changer", "unleash", or "supercharge".
+- Prefer short sentences and active voice. Explain jargon briefly when it first appears
+  if a mid-level engineer might not know it.
+- Use at most two emojis per post, and only where they aid scanning, such as at the start
+  of list items. Never put emojis in the hook line.
+- Do not address the reader as "folks" or "guys". "Engineers", "teams", or "you" are fine.
+
+Technical accuracy:
+- Only state facts that are widely documented and stable. Do not quote version numbers,
+  pricing, release dates, or benchmark figures unless they are common knowledge.
+- Prefer concrete, actionable advice: a specific practice, a configuration habit, a
+  failure mode and how to avoid it, or a trade-off between two approaches.
+- When mentioning a managed service, name the provider correctly: Amazon EKS is on AWS,
+  Azure Kubernetes Service (AKS) is on Microsoft Azure.
+- Keep the content vendor-neutral unless the topic itself is a vendor product.
+- Never include commands that delete data, disable security controls, or expose secrets,
+  and never include real credentials, tokens, account IDs, or internal hostnames.
+
+Topic guidance:
+- DevOps: culture and practice together. Cover CI/CD, automation, feedback loops, shared
+  ownership, and measuring outcomes such as deployment frequency and recovery time.
+- Kubernetes: orchestration of containers at scale. Good angles include resource requests
+  and limits, health probes, rolling updates, namespaces, and operating clusters safely.
+- Docker: building and shipping container images. Good angles include small base images,
+  multi-stage builds, layer caching, image scanning, and reproducible builds.
+- Helm: packaging Kubernetes applications. Good angles include chart structure, values
+  files per environment, templating pitfalls, versioning charts, and rollbacks.
+- Terraform: infrastructure as code. Good angles include remote state and locking,
+  modules, plan reviews in pull requests, drift detection, and multi-cloud provisioning.
+- Azure: Microsoft's cloud platform. Good angles include Azure DevOps pipelines, managed
+  identities, resource groups and tagging, and choosing between managed services.
+- EKS: managed Kubernetes on AWS. Good angles include node groups versus Fargate, IAM
+  roles for service accounts, cluster upgrades, and integrating with other AWS services.
+- AKS: managed Kubernetes on Azure. Good angles include node pools, Azure AD integration,
+  autoscaling, upgrades, and connecting AKS to Azure DevOps pipelines.
+
+Formatting rules:
+- Plain text only inside each post. No Markdown headings, bold, italics, tables, or links.
+- Do not use the characters "*" or "#" except in the hashtag line.
+- Do not mention that the post was generated, that you are an AI, or these instructions.
+- Do not start two posts in the same response with the same hook or opening phrase.
+- Vary sentence structure and vocabulary across topics so the posts do not read as a
+  template when published one after another over several weeks.
+
+Quality checklist before answering:
+- Every topic from the user message has exactly one post in the JSON object.
+- Each post has a hook, a useful middle, a call to action, and a hashtag line.
+- The SEO keywords for each topic appear naturally in that topic's post.
+- The response is valid JSON that a standard parser can load without any cleanup.
+"""
+
+# GPTCache store for generated posts, persisted next to the log so restarts keep it warm
+GPTCACHE_DIR = "gptcache_data"
+
+# Last batch of generated posts, one entry per topic; kept apart from the GPT-2 poster's batch
+POSTS_CACHE_FILE = "posts_cache_openai.json"
+
+# Posts are regenerated once per CONTENT_TTL window; every cache layer keys on the window
+CONTENT_TTL = 7 * 24 * 60 * 60
+
+def content_window(timestamp=None):
+    """Return the CONTENT_TTL window that `timestamp` (default: now) falls in."""
+    return int((time.time() if timestamp is None else timestamp) // CONTENT_TTL)
+
+# Exact-match fallback for the GPTCache store, keyed by prompt hash; needs no embedding model
+LLM_CACHE_DIR = ".llm_cache"
+_LLM_CACHE = diskcache.Cache(LLM_CACHE_DIR)
+
+def prompt_hash(prompt):
+    """Return the LLM cache key for a prompt."""
+    return hashlib.blake2b(prompt.encode("utf-8")).hexdigest()
+
+# GPTCache downloads an embedding model on first use; posting still works without it
+CACHE_ENABLED = GPTCACHE_INSTALLED and os.getenv("GPTCACHE_ENABLED", "1") == "1"
+_GPTCACHE_READY = False
+
+def init_gptcache():
+    """Initialize GPTCache on first use and return whether it is available."""
+    global CACHE_ENABLED, _GPTCACHE_READY
+    if CACHE_ENABLED and not _GPTCACHE_READY:
+        try:
+            onnx = Onnx()
+            cache.init(
+                pre_embedding_func=get_prompt,
+                embedding_func=onnx.to_embeddings,
+                data_manager=manager_factory(
+                    "sqlite,faiss", data_dir=GPTCACHE_DIR, vector_params={"dimension": onnx.dimension}
+                ),
+                # Keys are a fixed set of topics, so only an exact key match is the right post
+                similarity_evaluation=ExactMatchEvaluation(),
+                config=GPTCacheConfig(similarity_threshold=0.95),
+            )
+            _GPTCACHE_READY = True
+            logging.info("GPTCache initialized successfully.")
+        except Exception as e:
+            logging.error(f"Failed to initialize GPTCache, continuing without it: {e}")
+            CACHE_ENABLED = False
+    return CACHE_ENABLED
+
+def cache_key(topic):
+    """Build the content cache key for a topic from the model, the current window and its SEO keywords."""
+    return f"{OPENAI_MODEL} window {content_window()} | {topic}: {SEO_KEYWORDS[topic]}"
+
+def get_cached_content(topic):
+    """Return this window's post for the topic from GPTCache or its diskcache fallback, or None on a miss."""
+    try:
+        if init_gptcache():
+            return cache_get(cache_key(topic))
+        return _LLM_CACHE.get(prompt_hash(cache_key(topic)))
+    except Exception as e:
+        logging.error(f"Failed to read cached content for {topic}: {e}")
+        return None
+
+def put_cached_content(posts):
+    """Store freshly generated posts in GPTCache or its diskcache fallback; failures are only logged."""
+    try:
+        for topic, content in posts.items():
+            if init_gptcache():
+                cache_put(cache_key(topic), content)
+            else:
+                _LLM_CACHE.set(prompt_hash(cache_key(topic)), content, expire=CONTENT_TTL)
+    except Exception as e:
+        logging.error(f"Failed to store generated posts in the content cache: {e}")
+
+# Diagrams only depend on the topic, so each PNG is rendered once per process
+_DIAGRAM_CACHE = {}
+
+# In-process cache of generated posts; keys carry the window, so a new window always misses
+_CONTENT_CACHE = TTLCache(maxsize=len(TOPICS), ttl=CONTENT_TTL)
+
+class RateLimiter:
+    """Block callers until a request fits within per-minute request and token budgets."""
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.calls = deque()  # (timestamp, tokens) for each call in the last minute
+        self.lock = threading.Lock()
+
+    def wait(self, tokens):
+        """Wait until a call estimated at `tokens` tokens can be made, then record it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0][0] > 60:
+                    self.calls.popleft()
+                tokens_this_min = sum(call_tokens for _, call_tokens in self.calls)
+                if not self.calls or (len(self.calls) < self.rpm and tokens_this_min + tokens <= self.tpm):
+                    self.calls.append((now, tokens))
+                    return
+                delay = 60 - (now - self.calls[0][0])
+            logging.info(f"Rate limit reached. Waiting {delay:.1f}s before the next request.")
+            time.sleep(max(delay, 0.1))
+
+RATE_LIMITER = RateLimiter(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT)
+TOKEN_ENCODING = tiktoken.encoding_for_model(OPENAI_MODEL)
+
+# Output budget per post, including its share of the JSON wrapping; a truncated batch loses every post
+POST_MAX_TOKENS = 600
+
 # Track the current topic index
 current_topic_index = 0
 
+@retry(
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError)),
+    reraise=True,
+)
+def request_completion(messages, max_tokens):
+    """Send a JSON chat completion within the rate limits, retrying transient failures."""
+    prompt_tokens = sum(len(TOKEN_ENCODING.encode(message["content"])) for message in messages)
+    RATE_LIMITER.wait(prompt_tokens + max_tokens)
+    return client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=messages,
+        response_format={"type": "json_object"},
+        max_tokens=max_tokens,
+        temperature=0.7,
+    )
+
+def generate_all_content(topics):
+    """Generate SEO-friendly posts for all given topics in a single OpenAI call."""
+    user_prompt = "Write one LinkedIn post per topic and return them as a JSON object.\n\n" + "\n\n".join(
+        f"Topic: {topic}\nSEO: {SEO_KEYWORDS[topic]}" for topic in topics
+    )
+    messages = [
+        {"role": "system", "content": STATIC_INSTRUCTIONS},
+        {"role": "user", "content": user_prompt},
+    ]
+    response = request_completion(messages, max_tokens=POST_MAX_TOKENS * len(topics))
+    if response.choices[0].finish_reason == "length":
+        raise ValueError(f"Batch of {len(topics)} posts was cut off at the token limit")
+    posts = json.loads(response.choices[0].message.content)
+    return {
+        topic: posts[topic].strip()
+        for topic in topics
+        if isinstance(posts.get(topic), str) and posts[topic].strip()
+    }
+
+def save_posts(batch):
+    """Write the posts cache atomically so a crash or a concurrent reader never sees half a file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(POSTS_CACHE_FILE)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as posts_file:
+            json.dump(batch, posts_file, indent=2)
+        os.replace(tmp_path, POSTS_CACHE_FILE)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def load_posts(topics):
+    """Return posts for all given topics from the posts cache, regenerating the batch once it is stale."""
+    batch = {}
+    if os.path.exists(POSTS_CACHE_FILE):
+        with open(POSTS_CACHE_FILE, encoding="utf-8") as posts_file:
+            batch = json.load(posts_file)
+    # Republished posts are rejected by LinkedIn as duplicates, so a batch only serves its own window
+    if content_window(batch.get("generated_at", 0)) != content_window():
+        batch = {"generated_at": time.time(), "posts": {}}
+    posts = batch["posts"]
+
+    missing_topics = [topic for topic in topics if topic not in posts]
+    if missing_topics:
+        logging.info(f"Generating content for {len(missing_topics)} topics in one batch.")
+        generated_posts = generate_all_content(missing_topics)
+        posts.update(generated_posts)
+        save_posts(batch)  # Persist first so a GPTCache failure never throws away a paid-for batch
+        _CONTENT_CACHE.clear()  # Drop posts from the previous batch held in this process
+        put_cached_content(generated_posts)
+    return posts
+
 def generate_content(topic):
     """Generate SEO-friendly content for the given topic using OpenAI."""
+    key = cache_key(topic)
+    content = _CONTENT_CACHE.get(key)
+    if content:
+        return content
     try:
-        prompt = f"""
-        Write a short LinkedIn post about {topic} in the context of DevOps and cloud-native technologies.
-        The post should be engaging, informative, and suitable for a professional audience.
-        Include relevant keywords for Google and LinkedIn SEO: {SEO_KEYWORDS[topic]}.
-        """
-        response = openai.Completion.create(
-            engine="text-davinci-003",
-            prompt=prompt,
-            max_tokens=200,
-            n=1,
-            stop=None,
-            temperature=0.7,
-        )
-        return response.choices[0].text.strip()
+        content = get_cached_content(topic)
+        if content:
+            logging.info(f"Using cached content for topic: {topic}")
+        else:
+            content = load_posts(TOPICS).get(topic)
+        if content:
+            _CONTENT_CACHE[key] = content  # Failures are not cached so the next run retries
+        return content
     except Exception as e:
         logging.error(f"Failed to generate content for {topic}: {e}")
         return None
 
+def _render_kubernetes():
+    """Draw a Kubernetes cluster with a master and two worker nodes."""
+    from diagrams import Cluster, Edge
+    from diagrams.onprem.compute import Server
+
+    with Cluster("Kubernetes Cluster"):
+        master = Server("Master Node")
+        worker1 = Server("Worker Node 1")
+        worker2 = Server("Worker Node 2")
+        master >> Edge(color="blue") >> worker1
+        master >> Edge(color="blue") >> worker2
+
+def _render_docker():
+    """Draw two linked Docker containers."""
+    from diagrams import Cluster, Edge
+    from diagrams.onprem.compute import Server
+
+    with Cluster("Docker Containers"):
+        container1 = Server("Container 1")
+        container2 = Server("Container 2")
+        container1 >> Edge(color="green") >> container2
+
+def _render_eks():
+    """Draw Amazon EKS managing worker nodes."""
+    from diagrams import Edge
+    from diagrams.aws.compute import EKS
+    from diagrams.onprem.compute import Server
+
+    EKS("Amazon EKS") >> Edge(color="orange") >> Server("Worker Nodes")
+
+def _render_aks():
+    """Draw Azure AKS managing worker nodes."""
+    from diagrams import Edge
+    from diagrams.azure.compute import AKS
+    from diagrams.onprem.compute import Server
+
+    AKS("Azure AKS") >> Edge(color="purple") >> Server("Worker Nodes")
+
+def _render_terraform():
+    """Draw Terraform provisioning AWS, Azure and GCP."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="red") >> Server("Terraform")
+    Server("Terraform") >> Edge(color="red") >> [Server("AWS"), Server("Azure"), Server("GCP")]
+
+def _render_helm():
+    """Draw Helm deploying to Kubernetes."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="yellow") >> Server("Helm")
+    Server("Helm") >> Edge(color="yellow") >> Server("Kubernetes")
+
+def _render_azure():
+    """Draw Azure services backing AKS, Functions and Storage."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="blue") >> Server("Azure Services")
+    Server("Azure Services") >> Edge(color="blue") >> [Server("AKS"), Server("Functions"), Server("Storage")]
+
+def _render_devops():
+    """Draw a CI/CD pipeline feeding Kubernetes, Docker and Terraform."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="black") >> Server("CI/CD Pipeline")
+    Server("CI/CD Pipeline") >> Edge(color="black") >> [Server("Kubernetes"), Server("Docker"), Server("Terraform")]
+
+# Diagram renderer for each topic; each imports only the diagrams nodes it draws
+_RENDERERS = {
+    "Kubernetes": _render_kubernetes,
+    "Docker": _render_docker,
+    "EKS": _render_eks,
+    "AKS": _render_aks,
+    "Terraform": _render_terraform,
+    "Helm": _render_helm,
+    "Azure": _render_azure,
+    "DevOps": _render_devops,
+}
+
 def generate_diagram(topic):
-    """Generate a diagram for the given topic."""
+    """Render the diagram for the given topic to PNG bytes, reusing an earlier render."""
+    if topic in _DIAGRAM_CACHE:
+        return _DIAGRAM_CACHE[topic]
     try:
-        diagram_path = f"diagrams/{topic}_diagram.png"
-        with Diagram(topic, filename=diagram_path, outformat="png", show=False):
-            if topic == "Kubernetes":
-                with Cluster("Kubernetes Cluster"):
-                    master = Server("Master Node")
-                    worker1 = Server("Worker Node 1")
-                    worker2 = Server("Worker Node 2")
-                    master >> Edge(color="blue") >> worker1
-                    master >> Edge(color="blue") >> worker2
-            elif topic == "Docker":
-                with Cluster("Docker Containers"):
-                    container1 = Server("Container 1")
-                    container2 = Server("Container 2")
-                    container1 >> Edge(color="green") >> container2
-            elif topic == "EKS":
-                EKS("Amazon EKS") >> Edge(color="orange") >> Server("Worker Nodes")
-            elif topic == "AKS":
-                AKS("Azure AKS") >> Edge(color="purple") >> Server("Worker Nodes")
-            elif topic == "Terraform":
-                User("Developer") >> Edge(color="red") >> Server("Terraform")
-                Server("Terraform") >> Edge(color="red") >> [Server("AWS"), Server("Azure"), Server("GCP")]
-            elif topic == "Helm":
-                User("Developer") >> Edge(color="yellow") >> Server("Helm")
-                Server("Helm") >> Edge(color="yellow") >> Server("Kubernetes")
-            elif topic == "Azure":
-                User("Developer") >> Edge(color="blue") >> Server("Azure Services")
-                Server("Azure Services") >> Edge(color="blue") >> [Server("AKS"), Server("Functions"), Server("Storage")]
-            elif topic == "DevOps":
-                User("Developer") >> Edge(color="black") >> Server("CI/CD Pipeline")
-                Server("CI/CD Pipeline") >> Edge(color="black") >> [Server("Kubernetes"), Server("Docker"), Server("Terraform")]
-        return diagram_path
+        # Import diagrams lazily; each renderer imports the nodes it needs
+        from diagrams import Diagram, setdiagram
+
+        # Build the graph without the context manager, which would render to disk on exit
+        diagram = Diagram(topic, outformat="png", show=False)
+        setdiagram(diagram)
+        try:
+            _RENDERERS[topic]()
+        finally:
+            setdiagram(None)
+        diagram_png = diagram.dot.pipe(format="png")
+        _DIAGRAM_CACHE[topic] = diagram_png
+        return diagram_png
     except Exception as e:
         logging.error(f"Failed to generate diagram for {topic}: {e}")
         return None
 
-def upload_image_to_linkedin(image_path):
-    """Upload an image to LinkedIn and return the asset URN."""
+def upload_image_to_linkedin(image_png):
+    """Upload PNG bytes to LinkedIn and return the asset URN."""
     try:
-        headers = {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
-        }
-        register_url = "https://api.linkedin.com/v2/assets?action=registerUpload"
-        register_data = {
-            "registerUploadRequest": {
-                "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
-                "owner": "urn:li:person:{YOUR_PERSON_URN}",  # Replace with your LinkedIn Person URN
-                "serviceRelationships": [
-                    {
-                        "relationshipType": "OWNER",
-                        "identifier": "urn:li:userGeneratedContent",
-                    }
-                ],
-            }
-        }
-        response = requests.post(register_url, headers=headers, json=register_data)
+        response = LINKEDIN_CLIENT.post(REGISTER_UPLOAD_URL, content=REGISTER_UPLOAD_BODY, headers=JSON_HEADERS)
         response.raise_for_status()
         upload_url = response.json()["value"]["uploadMechanism"][
             "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"
@@ -145,8 +557,10 @@ def upload_image_to_linkedin(image_path):
         asset_urn = response.json()["value"]["asset"]
 
         # Upload the image
-        with open(image_path, "rb") as image_file:
-            upload_response = requests.post(upload_url, headers=headers, files={"file": image_file})
+        # LinkedIn expects the raw image bytes
+        upload_response = LINKEDIN_CLIENT.put(
+            upload_url, content=image_png, headers={"Content-Type": "application/octet-stream"}
+        )
         upload_response.raise_for_status()
 
         return asset_urn
@@ -157,24 +571,9 @@ def upload_image_to_linkedin(image_path):
 def post_to_linkedin(content, image_urn):
     """Post content with an image to LinkedIn."""
     try:
-        headers = {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-        post_url = "https://api.linkedin.com/v2/ugcPosts"
-        post_data = {
-            "author": "urn:li:person:{YOUR_PERSON_URN}",  # Replace with your LinkedIn Person URN
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {"text": content},
-                    "shareMediaCategory": "IMAGE",
-                    "media": [{"status": "READY", "media": image_urn}],
-                }
-            },
-            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
-        }
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = LINKEDIN_CLIENT.post(
+            UGC_POSTS_URL, content=build_post_body(content, image_urn), headers=JSON_HEADERS
+        )
         response.raise_for_status()
         logging.info("Posted to LinkedIn successfully!")
     except Exception as e:
@@ -187,20 +586,23 @@ def post_to_linkedin_with_image():
     topic = TOPICS[current_topic_index]
     logging.info(f"Generating content and diagram for topic: {topic}")
 
-    content = generate_content(topic)
+    # Content generation and diagram rendering are independent, so run them together
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        content_future = executor.submit(generate_content, topic)
+        diagram_future = executor.submit(generate_diagram, topic)
+        content, diagram_png = content_future.result(), diagram_future.result()
     if not content:
         logging.error("No content generated. Skipping post.")
         return
 
-    diagram_path = generate_diagram(topic)
-    if not diagram_path:
+    if not diagram_png:
         logging.error("No diagram generated. Skipping post.")
         return
 
     logging.info(f"Generated Content for {topic}:\n{content}")
-    logging.info(f"Diagram saved at: {diagram_path}")
+    logging.info(f"Rendered diagram for {topic} ({len(diagram_png)} bytes)")
 
-    image_urn = upload_image_to_linkedin(diagram_path)
+    image_urn = upload_image_to_linkedin(diagram_png)
     if not image_urn:
         logging.error("Failed to upload image. Skipping post.")
         return
@@ -214,12 +616,25 @@ def post_to_linkedin_with_image():
 # Schedule the post every day at 6 PM
 #schedule.every().day.at("18:00").do(post_to_linkedin_with_image)
 
+# Generate the whole cycle's posts once up front so scheduled runs only read the cache
+if schedule.get_jobs():
+    try:
+        load_posts(TOPICS)
+    except Exception as e:
+        logging.error(f"Failed to generate posts at startup: {e}")
+
 # Keep the script running
 logging.info("LinkedIn poster started. Waiting for scheduled posts...")
 while True:
     try:
+        # Sleep until the next job is due instead of polling every second
+        idle = schedule.idle_seconds()
+        if idle is None:
+            logging.info("No posts scheduled. Exiting.")
+            break
+        if idle > 0:
+            time.sleep(min(idle, 3600))  # Wake at least hourly to pick up clock changes
         schedule.run_pending()
-        time.sleep(1)
     except KeyboardInterrupt:
         logging.info("Script stopped by user.")
         break
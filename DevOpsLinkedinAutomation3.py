@@ -1,13 +1,30 @@
+import asyncio
+import json
 import os
+import time
 import logging
-import requests
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass, field, fields
+from multiprocessing import get_context
+from string import Template
+import httpx
+import diskcache
 from dotenv import load_dotenv
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import EKS
-from diagrams.azure.compute import AKS
-from diagrams.onprem.client import User
-from diagrams.onprem.compute import Server
-from transformers import pipeline  # Hugging Face Transformers
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+# GPTCache is optional; the diskcache store below stands in when it is missing
+try:
+    from gptcache import cache, Config as GPTCacheConfig
+    from gptcache.adapter.api import get as cache_get, put as cache_put
+    from gptcache.embedding import Onnx
+    from gptcache.manager import manager_factory
+    from gptcache.processor.pre import get_prompt
+    from gptcache.similarity_evaluation.exact_match import ExactMatchEvaluation
+    GPTCACHE_INSTALLED = True
+except ImportError:
+    GPTCACHE_INSTALLED = False
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,22 +38,85 @@ logging.basicConfig(
 
 logging.info("Script started.")
 
-# Initialize Hugging Face pipeline
+# GPT-2 worker (worker.py) that keeps the model resident between runs
+GPT2_WORKER_URL = os.getenv("GPT2_WORKER_URL", "http://127.0.0.1:8765")
+
+# API credentials, validated once at startup so no LLM budget is spent on a post that would 401
+@dataclass(frozen=True)
+class Config:
+    """LinkedIn credentials the poster needs."""
+
+    client_id: str = field(metadata={"env": "LINKEDIN_CLIENT_ID"})
+    client_secret: str = field(repr=False, metadata={"env": "LINKEDIN_CLIENT_SECRET"})
+    linkedin_token: str = field(repr=False, metadata={"env": "LINKEDIN_ACCESS_TOKEN"})  # Refresh this token periodically
+    person_urn: str = field(metadata={"env": "LINKEDIN_PERSON_URN"})  # e.g. urn:li:person:abc123
+    auth_header: bytes = field(init=False, repr=False)
+
+    def __post_init__(self):
+        missing = [f.metadata["env"] for f in fields(self) if f.init and not getattr(self, f.name)]
+        if missing:
+            raise ValueError(f"Missing credentials in environment variables: {', '.join(missing)}")
+        object.__setattr__(self, "auth_header", f"Bearer {self.linkedin_token}".encode())
+
+    @classmethod
+    def from_env(cls):
+        """Build the config from environment variables."""
+        return cls(**{f.name: os.getenv(f.metadata["env"]) for f in fields(cls) if f.init})
+
 try:
-    generator = pipeline("text-generation", model="gpt2")  # Use GPT-2 for free text generation
-    logging.info("Hugging Face pipeline initialized successfully.")
-except Exception as e:
-    logging.error(f"Failed to initialize Hugging Face pipeline: {e}")
+    CFG = Config.from_env()
+except ValueError as e:
+    logging.error(e)
     exit(1)
 
-# LinkedIn API credentials
-CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
-CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
-ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")  # Refresh this token periodically
+# Client for calls to the local GPT-2 worker; batched generation can take minutes
+WORKER_CLIENT = httpx.Client(timeout=httpx.Timeout(600.0))
 
-if not all([CLIENT_ID, CLIENT_SECRET, ACCESS_TOKEN]):
-    logging.error("LinkedIn credentials not found in environment variables.")
-    exit(1)
+# Default headers for every LinkedIn API call
+LINKEDIN_HEADERS = {"Authorization": CFG.auth_header}
+
+# LinkedIn endpoints and request bodies, serialized once instead of on every post
+REGISTER_UPLOAD_URL = "https://api.linkedin.com/v2/assets?action=registerUpload"
+UGC_POSTS_URL = "https://api.linkedin.com/v2/ugcPosts"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+REGISTER_UPLOAD_BODY = json.dumps(
+    {
+        "registerUploadRequest": {
+            "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
+            "owner": CFG.person_urn,
+            "serviceRelationships": [
+                {
+                    "relationshipType": "OWNER",
+                    "identifier": "urn:li:userGeneratedContent",
+                }
+            ],
+        }
+    }
+).encode()
+
+POST_BODY_TEMPLATE = Template(
+    json.dumps(
+        {
+            "author": CFG.person_urn,
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {"text": "$content"},
+                    "shareMediaCategory": "IMAGE",
+                    "media": [{"status": "READY", "media": "$image_urn"}],
+                }
+            },
+            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
+        }
+    )
+)
+
+def build_post_body(content, image_urn):
+    """Fill the ugcPosts template with JSON-escaped content and image URN."""
+    return POST_BODY_TEMPLATE.substitute(
+        content=json.dumps(content)[1:-1], image_urn=json.dumps(image_urn)[1:-1]
+    ).encode()
 
 # List of topics to cycle through
 TOPICS = [
@@ -62,94 +142,332 @@ SEO_KEYWORDS = {
     "AKS": "Azure Kubernetes Service, managed Kubernetes, cloud-native apps, Azure DevOps, container orchestration",
 }
 
-# Track the current topic index
-current_topic_index = 0
+# GPTCache store for generated posts, persisted next to the log so restarts keep it warm
+GPTCACHE_DIR = "gptcache_data"
+
+# Last batch of generated posts, one entry per topic; kept apart from the OpenAI poster's batch
+POSTS_CACHE_FILE = "posts_cache_gpt2.json"
 
-def generate_content(topic):
-    """Generate SEO-friendly content for the given topic using Hugging Face."""
+# Posts are regenerated once per CONTENT_TTL window; every cache layer keys on the window
+CONTENT_TTL = 7 * 24 * 60 * 60
+
+def content_window(timestamp=None):
+    """Return the CONTENT_TTL window that `timestamp` (default: now) falls in."""
+    return int((time.time() if timestamp is None else timestamp) // CONTENT_TTL)
+
+# Exact-match fallback for the GPTCache store, keyed by prompt hash; needs no embedding model
+LLM_CACHE_DIR = ".llm_cache"
+_LLM_CACHE = diskcache.Cache(LLM_CACHE_DIR)
+
+def prompt_hash(prompt):
+    """Return the LLM cache key for a prompt."""
+    return hashlib.blake2b(prompt.encode("utf-8")).hexdigest()
+
+# GPTCache downloads an embedding model on first use; posting still works without it
+CACHE_ENABLED = GPTCACHE_INSTALLED and os.getenv("GPTCACHE_ENABLED", "1") == "1"
+_GPTCACHE_READY = False
+
+def init_gptcache():
+    """Initialize GPTCache on first use and return whether it is available."""
+    global CACHE_ENABLED, _GPTCACHE_READY
+    if CACHE_ENABLED and not _GPTCACHE_READY:
+        try:
+            onnx = Onnx()
+            cache.init(
+                pre_embedding_func=get_prompt,
+                embedding_func=onnx.to_embeddings,
+                data_manager=manager_factory(
+                    "sqlite,faiss", data_dir=GPTCACHE_DIR, vector_params={"dimension": onnx.dimension}
+                ),
+                # Keys are a fixed set of topics, so only an exact key match is the right post
+                similarity_evaluation=ExactMatchEvaluation(),
+                config=GPTCacheConfig(similarity_threshold=0.95),
+            )
+            _GPTCACHE_READY = True
+            logging.info("GPTCache initialized successfully.")
+        except Exception as e:
+            logging.error(f"Failed to initialize GPTCache, continuing without it: {e}")
+            CACHE_ENABLED = False
+    return CACHE_ENABLED
+
+def cache_key(topic):
+    """Build the content cache key for a topic from the model, the current window and its SEO keywords."""
+    return f"gpt2 window {content_window()} | {topic}: {SEO_KEYWORDS[topic]}"
+
+def get_cached_content(topic):
+    """Return this window's post for the topic from GPTCache or its diskcache fallback, or None on a miss."""
+    try:
+        if init_gptcache():
+            return cache_get(cache_key(topic))
+        return _LLM_CACHE.get(prompt_hash(cache_key(topic)))
+    except Exception as e:
+        logging.error(f"Failed to read cached content for {topic}: {e}")
+        return None
+
+def put_cached_content(posts):
+    """Store freshly generated posts in GPTCache or its diskcache fallback; failures are only logged."""
     try:
-        prompt = f"""
+        for topic, content in posts.items():
+            if init_gptcache():
+                cache_put(cache_key(topic), content)
+            else:
+                _LLM_CACHE.set(prompt_hash(cache_key(topic)), content, expire=CONTENT_TTL)
+    except Exception as e:
+        logging.error(f"Failed to store generated posts in the content cache: {e}")
+
+# Diagrams only depend on the topic, so each PNG is rendered once per process
+_DIAGRAM_CACHE = {}
+
+class RateLimiter:
+    """Block callers until a request fits within per-minute request and token budgets."""
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.calls = deque()  # (timestamp, tokens) for each call in the last minute
+        self.lock = threading.Lock()
+
+    def wait(self, tokens):
+        """Wait until a call estimated at `tokens` tokens can be made, then record it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0][0] > 60:
+                    self.calls.popleft()
+                tokens_this_min = sum(call_tokens for _, call_tokens in self.calls)
+                if not self.calls or (len(self.calls) < self.rpm and tokens_this_min + tokens <= self.tpm):
+                    self.calls.append((now, tokens))
+                    return
+                delay = 60 - (now - self.calls[0][0])
+            logging.info(f"Rate limit reached. Waiting {delay:.1f}s before the next request.")
+            time.sleep(max(delay, 0.1))
+
+# Local generation budget; keeps bursts of GPT-2 calls from saturating the CPU
+GPT2_RPM_LIMIT = 30
+GPT2_TPM_LIMIT = 6000
+RATE_LIMITER = RateLimiter(GPT2_RPM_LIMIT, GPT2_TPM_LIMIT)
+
+def build_prompt(topic):
+    """Build the GPT-2 prompt for the given topic."""
+    return f"""
         Write a short LinkedIn post about {topic} in the context of DevOps and cloud-native technologies.
         The post should be engaging, informative, and suitable for a professional audience.
         Include relevant keywords for Google and LinkedIn SEO: {SEO_KEYWORDS[topic]}.
         """
-        logging.info(f"Generating content for topic: {topic}")
-        response = generator(prompt, max_length=200, num_return_sequences=1)
-        return response[0]["generated_text"].strip()
-    except Exception as e:
-        logging.error(f"Failed to generate content for {topic}: {e}")
-        return None
+
+def is_transient_worker_error(exception):
+    """Return whether a worker request failed in a way that retrying can fix."""
+    if isinstance(exception, httpx.HTTPStatusError):
+        return exception.response.status_code >= 500  # A 4xx such as a 422 fails the same way again
+    return isinstance(exception, httpx.TransportError)
+
+# The worker may be restarting under systemd, so retry dropped connections and server errors
+@retry(
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception(is_transient_worker_error),
+    reraise=True,
+)
+def request_generation(prompts, max_length):
+    """Ask the GPT-2 worker for one completion per prompt, within the rate limits."""
+    RATE_LIMITER.wait(max_length * len(prompts))  # max_length caps prompt and generated tokens together
+    response = WORKER_CLIENT.post(
+        f"{GPT2_WORKER_URL}/generate", json={"prompts": prompts, "max_length": max_length}
+    )
+    response.raise_for_status()
+    return response.json()["texts"]
+
+def generate_all_content(topics):
+    """Generate SEO-friendly posts for all given topics in a single batched worker call."""
+    texts = request_generation([build_prompt(topic) for topic in topics], max_length=200)
+    return dict(zip(topics, texts))
+
+def save_posts(batch):
+    """Write the posts cache atomically so a crash or a concurrent reader never sees half a file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(POSTS_CACHE_FILE)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as posts_file:
+            json.dump(batch, posts_file, indent=2)
+        os.replace(tmp_path, POSTS_CACHE_FILE)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def read_batch():
+    """Return the current window's batch from the posts cache, or a new empty batch if it is stale."""
+    batch = {}
+    if os.path.exists(POSTS_CACHE_FILE):
+        with open(POSTS_CACHE_FILE, encoding="utf-8") as posts_file:
+            batch = json.load(posts_file)
+    # Republished posts are rejected by LinkedIn as duplicates, so a batch only serves its own window
+    if content_window(batch.get("generated_at", 0)) != content_window():
+        batch = {"generated_at": time.time(), "posts": {}}
+    return batch
+
+def load_posts(topics):
+    """Return posts for all given topics from the posts cache, regenerating the batch once it is stale."""
+    batch = read_batch()
+    posts = batch["posts"]
+
+    missing_topics = [topic for topic in topics if topic not in posts]
+    if missing_topics:
+        logging.info(f"Generating content for {len(missing_topics)} topics in one batch.")
+        generated_posts = generate_all_content(missing_topics)
+        posts.update(generated_posts)
+        save_posts(batch)  # Persist first so a GPTCache failure never throws away a generated batch
+        put_cached_content(generated_posts)
+    return posts
+
+def collect_posts(topics):
+    """Return this window's posts for the given topics, from GPTCache first and then the posts cache."""
+    posts = {}
+    for topic in topics:
+        content = get_cached_content(topic)
+        if content:
+            logging.info(f"Using cached content for topic: {topic}")
+            posts[topic] = content
+
+    missing_topics = [topic for topic in topics if topic not in posts]
+    if missing_topics:
+        batch_posts = load_posts(missing_topics)
+        posts.update({topic: batch_posts[topic] for topic in missing_topics if topic in batch_posts})
+    return posts
+
+def mark_posted(topics, window):
+    """Record topics published in the given window so later runs in that window skip them."""
+    if content_window() != window:
+        return  # The window rolled over mid-run; its successor starts with nothing posted
+    batch = read_batch()
+    batch["posted"] = sorted(set(batch.get("posted", [])) | set(topics))
+    save_posts(batch)
+
+def _render_kubernetes():
+    """Draw a Kubernetes cluster with a master and two worker nodes."""
+    from diagrams import Cluster, Edge
+    from diagrams.onprem.compute import Server
+
+    with Cluster("Kubernetes Cluster"):
+        master = Server("Master Node")
+        worker1 = Server("Worker Node 1")
+        worker2 = Server("Worker Node 2")
+        master >> Edge(color="blue") >> worker1
+        master >> Edge(color="blue") >> worker2
+
+def _render_docker():
+    """Draw two linked Docker containers."""
+    from diagrams import Cluster, Edge
+    from diagrams.onprem.compute import Server
+
+    with Cluster("Docker Containers"):
+        container1 = Server("Container 1")
+        container2 = Server("Container 2")
+        container1 >> Edge(color="green") >> container2
+
+def _render_eks():
+    """Draw Amazon EKS managing worker nodes."""
+    from diagrams import Edge
+    from diagrams.aws.compute import EKS
+    from diagrams.onprem.compute import Server
+
+    EKS("Amazon EKS") >> Edge(color="orange") >> Server("Worker Nodes")
+
+def _render_aks():
+    """Draw Azure AKS managing worker nodes."""
+    from diagrams import Edge
+    from diagrams.azure.compute import AKS
+    from diagrams.onprem.compute import Server
+
+    AKS("Azure AKS") >> Edge(color="purple") >> Server("Worker Nodes")
+
+def _render_terraform():
+    """Draw Terraform provisioning AWS, Azure and GCP."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="red") >> Server("Terraform")
+    Server("Terraform") >> Edge(color="red") >> [Server("AWS"), Server("Azure"), Server("GCP")]
+
+def _render_helm():
+    """Draw Helm deploying to Kubernetes."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="yellow") >> Server("Helm")
+    Server("Helm") >> Edge(color="yellow") >> Server("Kubernetes")
+
+def _render_azure():
+    """Draw Azure services backing AKS, Functions and Storage."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="blue") >> Server("Azure Services")
+    Server("Azure Services") >> Edge(color="blue") >> [Server("AKS"), Server("Functions"), Server("Storage")]
+
+def _render_devops():
+    """Draw a CI/CD pipeline feeding Kubernetes, Docker and Terraform."""
+    from diagrams import Edge
+    from diagrams.onprem.client import User
+    from diagrams.onprem.compute import Server
+
+    User("Developer") >> Edge(color="black") >> Server("CI/CD Pipeline")
+    Server("CI/CD Pipeline") >> Edge(color="black") >> [Server("Kubernetes"), Server("Docker"), Server("Terraform")]
+
+# Diagram renderer for each topic; each imports only the diagrams nodes it draws
+_RENDERERS = {
+    "Kubernetes": _render_kubernetes,
+    "Docker": _render_docker,
+    "EKS": _render_eks,
+    "AKS": _render_aks,
+    "Terraform": _render_terraform,
+    "Helm": _render_helm,
+    "Azure": _render_azure,
+    "DevOps": _render_devops,
+}
 
 def generate_diagram(topic):
-    """Generate a diagram for the given topic."""
+    """Render the diagram for the given topic to PNG bytes, reusing an earlier render."""
+    if topic in _DIAGRAM_CACHE:
+        return _DIAGRAM_CACHE[topic]
     try:
-        diagram_path = f"D:/The Devops Junction/Linkedinautomation/diagrams/{topic}_diagram.png"
         logging.info(f"Generating diagram for topic: {topic}")
-        with Diagram(topic, filename=diagram_path, outformat="png", show=False):
-            if topic == "Kubernetes":
-                with Cluster("Kubernetes Cluster"):
-                    master = Server("Master Node")
-                    worker1 = Server("Worker Node 1")
-                    worker2 = Server("Worker Node 2")
-                    master >> Edge(color="blue") >> worker1
-                    master >> Edge(color="blue") >> worker2
-            elif topic == "Docker":
-                with Cluster("Docker Containers"):
-                    container1 = Server("Container 1")
-                    container2 = Server("Container 2")
-                    container1 >> Edge(color="green") >> container2
-            elif topic == "EKS":
-                EKS("Amazon EKS") >> Edge(color="orange") >> Server("Worker Nodes")
-            elif topic == "AKS":
-                AKS("Azure AKS") >> Edge(color="purple") >> Server("Worker Nodes")
-            elif topic == "Terraform":
-                User("Developer") >> Edge(color="red") >> Server("Terraform")
-                Server("Terraform") >> Edge(color="red") >> [Server("AWS"), Server("Azure"), Server("GCP")]
-            elif topic == "Helm":
-                User("Developer") >> Edge(color="yellow") >> Server("Helm")
-                Server("Helm") >> Edge(color="yellow") >> Server("Kubernetes")
-            elif topic == "Azure":
-                User("Developer") >> Edge(color="blue") >> Server("Azure Services")
-                Server("Azure Services") >> Edge(color="blue") >> [Server("AKS"), Server("Functions"), Server("Storage")]
-            elif topic == "DevOps":
-                User("Developer") >> Edge(color="black") >> Server("CI/CD Pipeline")
-                Server("CI/CD Pipeline") >> Edge(color="black") >> [Server("Kubernetes"), Server("Docker"), Server("Terraform")]
-        return diagram_path
+        # Import diagrams lazily; each renderer imports the nodes it needs
+        from diagrams import Diagram, setdiagram
+
+        # Build the graph without the context manager, which would render to disk on exit
+        diagram = Diagram(topic, outformat="png", show=False)
+        setdiagram(diagram)
+        try:
+            _RENDERERS[topic]()
+        finally:
+            setdiagram(None)
+        diagram_png = diagram.dot.pipe(format="png")
+        _DIAGRAM_CACHE[topic] = diagram_png
+        return diagram_png
     except Exception as e:
         logging.error(f"Failed to generate diagram for {topic}: {e}")
         return None
 
-def upload_image_to_linkedin(image_path):
-    """Upload an image to LinkedIn and return the asset URN."""
+async def upload_image_to_linkedin(client, image_png):
+    """Upload PNG bytes to LinkedIn and return the asset URN."""
     try:
-        headers = {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
-        }
-        register_url = "https://api.linkedin.com/v2/assets?action=registerUpload"
-        register_data = {
-            "registerUploadRequest": {
-                "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
-                "owner": "urn:li:person:{YOUR_PERSON_URN}",  # Replace with your LinkedIn Person URN
-                "serviceRelationships": [
-                    {
-                        "relationshipType": "OWNER",
-                        "identifier": "urn:li:userGeneratedContent",
-                    }
-                ],
-            }
-        }
         logging.info("Registering image upload with LinkedIn.")
-        response = requests.post(register_url, headers=headers, json=register_data)
+        response = await client.post(REGISTER_UPLOAD_URL, content=REGISTER_UPLOAD_BODY, headers=JSON_HEADERS)
         response.raise_for_status()
-        upload_url = response.json()["value"]["uploadMechanism"][
+        register_response = response.json()
+        upload_url = register_response["value"]["uploadMechanism"][
             "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"
         ]["uploadUrl"]
-        asset_urn = response.json()["value"]["asset"]
+        asset_urn = register_response["value"]["asset"]
 
         # Upload the image
         logging.info("Uploading image to LinkedIn.")
-        with open(image_path, "rb") as image_file:
-            upload_response = requests.post(upload_url, headers=headers, files={"file": image_file})
+        # LinkedIn expects the raw image bytes
+        upload_response = await client.put(
+            upload_url, content=image_png, headers={"Content-Type": "application/octet-stream"}
+        )
         upload_response.raise_for_status()
 
         return asset_urn
@@ -157,64 +475,71 @@ def upload_image_to_linkedin(image_path):
         logging.error(f"Failed to upload image to LinkedIn: {e}")
         return None
 
-def post_to_linkedin(content, image_urn):
+async def post_to_linkedin(client, content, image_urn):
     """Post content with an image to LinkedIn."""
     try:
-        headers = {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-        post_url = "https://api.linkedin.com/v2/ugcPosts"
-        post_data = {
-            "author": "urn:li:person:{YOUR_PERSON_URN}",  # Replace with your LinkedIn Person URN
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {"text": content},
-                    "shareMediaCategory": "IMAGE",
-                    "media": [{"status": "READY", "media": image_urn}],
-                }
-            },
-            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
-        }
         logging.info("Posting content to LinkedIn.")
-        response = requests.post(post_url, headers=headers, json=post_data)
+        response = await client.post(
+            UGC_POSTS_URL, content=build_post_body(content, image_urn), headers=JSON_HEADERS
+        )
         response.raise_for_status()
         logging.info("Posted to LinkedIn successfully!")
+        return True
     except Exception as e:
         logging.error(f"Failed to post to LinkedIn: {e}")
+        return False
 
-def post_to_linkedin_with_image():
-    """Generate content and diagram for the current topic and post it to LinkedIn."""
-    global current_topic_index
-
-    topic = TOPICS[current_topic_index]
-    logging.info(f"Generating content and diagram for topic: {topic}")
-
-    content = generate_content(topic)
-    if not content:
-        logging.error("No content generated. Skipping post.")
-        return
-
-    diagram_path = generate_diagram(topic)
-    if not diagram_path:
+async def post_to_linkedin_with_image(topic, content):
+    """Render the diagram for the given topic and post it to LinkedIn; return whether it was posted."""
+    diagram_png = await asyncio.to_thread(generate_diagram, topic)
+    if not diagram_png:
         logging.error("No diagram generated. Skipping post.")
-        return
+        return False
 
     logging.info(f"Generated Content for {topic}:\n{content}")
-    logging.info(f"Diagram saved at: {diagram_path}")
+    logging.info(f"Rendered diagram for {topic} ({len(diagram_png)} bytes)")
 
-    image_urn = upload_image_to_linkedin(diagram_path)
-    if not image_urn:
-        logging.error("Failed to upload image. Skipping post.")
-        return
+    # One HTTP/2 connection carries the register, upload and post requests
+    async with httpx.AsyncClient(
+        headers=LINKEDIN_HEADERS,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=75),
+        ),
+        timeout=httpx.Timeout(10.0),
+    ) as client:
+        image_urn = await upload_image_to_linkedin(client, diagram_png)
+        if not image_urn:
+            logging.error("Failed to upload image. Skipping post.")
+            return False
 
-    post_to_linkedin(content, image_urn)
+        return await post_to_linkedin(client, content, image_urn)
 
-    # Move to the next topic for the next run
-    current_topic_index = (current_topic_index + 1) % len(TOPICS)
-    logging.info(f"Next topic: {TOPICS[current_topic_index]}")
+def post_single_topic(topic, content):
+    """Post the given topic and its pre-generated content from a pool worker process."""
+    return asyncio.run(post_to_linkedin_with_image(topic, content))
 
-# Run the post function immediately
+# Post every topic not yet posted this window, immediately
 if __name__ == "__main__":
-    post_to_linkedin_with_image()
\ No newline at end of file
+    window = content_window()
+    posted_topics = set(read_batch().get("posted", []))
+    topics = [topic for topic in TOPICS if topic not in posted_topics]
+    if posted_topics:
+        logging.info(f"Skipping topics already posted this window: {', '.join(sorted(posted_topics))}")
+
+    # Generate every post here so the worker processes never touch the GPT-2 worker, the cache or the rate limiter
+    posts = {}
+    try:
+        posts = collect_posts(topics)
+    except Exception as e:
+        logging.error(f"Failed to generate posts: {e}")
+    if not topics:
+        logging.info("Every topic was already posted this window. Nothing to do.")
+    elif not posts:
+        logging.error("No content generated. Skipping all posts.")
+    else:
+        # Spawn rather than fork so children do not share the parent's open sockets
+        with get_context("spawn").Pool(processes=min(len(posts), os.cpu_count() or 1)) as pool:
+            results = pool.starmap(post_single_topic, posts.items())
+        mark_posted([topic for topic, posted in zip(posts, results) if posted], window)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import logging
+import threading
+from contextlib import asynccontextmanager
+import requests
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from optimum.onnxruntime import ORTModelForCausalLM, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer, pipeline  # Hugging Face Transformers
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.FileHandler("gpt2_worker.log"), logging.StreamHandler()],
+)
+
+# Address the worker listens on; DevOpsLinkedinAutomation3.py posts prompts here
+WORKER_HOST = os.getenv("GPT2_WORKER_HOST", "127.0.0.1")
+WORKER_PORT = int(os.getenv("GPT2_WORKER_PORT", "8765"))
+
+# Int8-quantized ONNX export of GPT-2, created on first run and reused afterwards
+GPT2_ONNX_DIR = "gpt2_onnx"
+GPT2_ONNX_FILE = "model_quantized.onnx"
+
+# Hugging Face pipeline, loaded once at startup and kept resident between requests
+_GENERATOR = None
+_GENERATOR_LOCK = threading.Lock()
+
+def export_gpt2_onnx():
+    """Export GPT-2 to ONNX and quantize its weights to int8 for faster CPU inference."""
+    logging.info("Exporting GPT-2 to ONNX with int8 weights.")
+    model = ORTModelForCausalLM.from_pretrained("gpt2", export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(
+        save_dir=GPT2_ONNX_DIR,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+    )
+    AutoTokenizer.from_pretrained("gpt2").save_pretrained(GPT2_ONNX_DIR)
+
+# Model downloads from the Hugging Face Hub can be rate limited or drop, so retry them
+@retry(
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception_type((requests.HTTPError, requests.ConnectionError)),
+    reraise=True,
+)
+def get_generator():
+    """Return the Hugging Face text-generation pipeline, loading it on first use."""
+    global _GENERATOR
+    if _GENERATOR is None:
+        if not os.path.exists(os.path.join(GPT2_ONNX_DIR, GPT2_ONNX_FILE)):
+            export_gpt2_onnx()
+        model = ORTModelForCausalLM.from_pretrained(
+            GPT2_ONNX_DIR, file_name=GPT2_ONNX_FILE, provider="CPUExecutionProvider"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(GPT2_ONNX_DIR)
+        # GPT-2 has no pad token; pad on the left with EOS so batched prompts can be generated together
+        tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+        _GENERATOR = pipeline("text-generation", model=model, tokenizer=tokenizer)  # GPT-2 on ONNX Runtime
+        logging.info("Hugging Face pipeline initialized successfully.")
+    return _GENERATOR
+
+class GenerateRequest(BaseModel):
+    """Prompts to complete in one batch."""
+
+    prompts: list[str]
+    max_length: int = 200
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load the model before the worker starts accepting requests."""
+    get_generator()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+@app.post("/generate")
+def generate(request: GenerateRequest):
+    """Generate one completion per prompt with the resident GPT-2 pipeline."""
+    if not request.prompts:
+        return {"texts": []}
+    logging.info(f"Generating {len(request.prompts)} completions.")
+    with _GENERATOR_LOCK:
+        responses = get_generator()(
+            request.prompts,
+            max_length=request.max_length,
+            num_return_sequences=1,
+            batch_size=len(request.prompts),
+        )
+    return {"texts": [response[0]["generated_text"].strip() for response in responses]}
+
+# Run the worker; keep it up under systemd (see gpt2-worker.service) so restarts of the poster stay warm
+if __name__ == "__main__":
+    uvicorn.run(app, host=WORKER_HOST, port=WORKER_PORT)